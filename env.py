@@ -3,7 +3,7 @@ import random
 import pygame
 from typing import Tuple, Dict, Any, List
 from game import Game
-from config import LANES, HEIGHT
+from config import HEIGHT
 
 # Actions: 0=left, 1=stay, 2=right
 LEFT, STAY, RIGHT = 0, 1, 2
@@ -14,13 +14,20 @@ class LaneDodgeEnv:
     Observation: (lane, dist_left, dist_mid, dist_right),
     where distances are normalized [0..1] to the nearest upcoming obstacle
     in each lane (1.0 means clear; 0.0 means very close).
+
+    step() returns (obs, reward, terminated, truncated, info):
+    terminated = the car crashed (or the window was closed),
+    truncated  = the episode hit max_episode_steps (None = no limit).
+    Learners should only bootstrap from obs when not terminated.
     """
-    def __init__(self, render_mode: str = "human", seed: int | None = None):
+    def __init__(self, render_mode: str = "human", seed: int | None = None,
+                 max_episode_steps: int | None = None):
         self.render_mode = render_mode
+        self.max_episode_steps = max_episode_steps
+        self._elapsed_steps = 0
         if seed is not None:
             random.seed(seed)
         self.game = Game()  # creates window
-        self._counted_pass: set[int] = set()
         self._closed = False
 
     def close(self):
@@ -32,12 +39,12 @@ class LaneDodgeEnv:
         if seed is not None:
             random.seed(seed)
         self.game.reset()
-        self._counted_pass.clear()
+        self._elapsed_steps = 0
         obs = self._observe()
         info = {"score": self.game.score}
         return obs, info
 
-    def step(self, action: int) -> Tuple[Tuple[float, ...], float, bool, Dict[str, Any]]:
+    def step(self, action: int) -> Tuple[Tuple[float, ...], float, bool, bool, Dict[str, Any]]:
         """One environment step = one game frame."""
         # Minimal event pump (so the window doesn't freeze)
         for e in pygame.event.get():
@@ -54,6 +61,7 @@ class LaneDodgeEnv:
 
         # Tick game
         self.game.update()
+        self._elapsed_steps += 1
         if self.render_mode == "human":
             self.game.draw()
             self.game.clock.tick(60)
@@ -61,47 +69,38 @@ class LaneDodgeEnv:
         # Reward: small survival +1 per newly passed obstacle, large - on crash
         passed_now = self._compute_newly_passed_count()
         reward = 0.01 + 1.0 * passed_now
-        done = self.game.game_over
-        if done:
+        terminated = self.game.game_over
+        if terminated:
             reward -= 10.0
 
+        # Time limit: the car is still alive, so this is a truncation, not a terminal state
+        truncated = (not terminated
+                     and self.max_episode_steps is not None
+                     and self._elapsed_steps >= self.max_episode_steps)
+
         obs = self._observe()
         info = {
             "passed": passed_now,
             "score": self.game.score,
             "closed": self._closed,
+            "steps": self._elapsed_steps,
         }
-        return obs, reward, done, info
+        return obs, reward, terminated, truncated, info
 
     # ---------------------- Helpers ---------------------- #
 
     def _compute_newly_passed_count(self) -> int:
         """Counts obstacles that moved below the car this frame (not yet counted)."""
-        count = 0
-        car_bottom = self.game.player.rect.bottom
-        for ob in self.game.obstacles:
-            uid = getattr(ob, "uid", id(ob))
-            if ob.rect.top > car_bottom and uid not in self._counted_pass:
-                self._counted_pass.add(uid)
-                count += 1
-        return count
+        return self.game.obstacles.mark_passed(self.game.player.rect.bottom)
 
     def _observe(self) -> Tuple[float, ...]:
         """Lane index + normalized distances to nearest obstacle ahead in each lane."""
         ptop = self.game.player.rect.top
-        # init with far (1.0 means clear)
-        dists = [1.0 for _ in range(LANES)]
-
-        for ob in self.game.obstacles:
-            lane = getattr(ob, "lane_idx", None)
-            if lane is None or not (0 <= lane < LANES):
-                continue
-            # Only obstacles AHEAD of the car (above it on screen)
-            if ob.rect.bottom <= ptop:
-                pix = ptop - ob.rect.bottom
-                norm = max(0.0, min(1.0, pix / HEIGHT))
-                dists[lane] = min(dists[lane], norm)
+        # Pixel gap to the nearest obstacle AHEAD of the car (above it on screen);
+        # lanes with none get HEIGHT, i.e. 1.0 = clear
+        gaps = self.game.obstacles.gaps_ahead(ptop, HEIGHT)
+        dists = [min(1.0, g / HEIGHT) for g in gaps]
 
         lane_idx = getattr(self.game.player, "lane", 1)
-        return (float(lane_idx), *[float(x) for x in dists])
+        return (float(lane_idx), *dists)
 
@@ -2,7 +2,7 @@
 import random
 import pygame
 from config import WIDTH, HEIGHT, FPS, BG, ROAD, LANE_LINE, HUD, HUD_SHADOW, ROAD_MARGIN, LANE_LINE_WIDTH, LANES, SCROLL_SPEED, SPAWN_EVERY_FRAMES, FONT_SMALL, FONT_BIG
-from sprites import LaneHelper, Car, Obstacle
+from sprites import LaneHelper, Car, ObstacleStore
 from assets import load_assets
 
 class Game:
@@ -15,12 +15,10 @@ class Game:
         self.lanes = LaneHelper()
         self.player = Car(self.assets["car.png"], self.lanes)
         self.all_sprites = pygame.sprite.Group(self.player)
-        self.obstacles = pygame.sprite.Group()
         self.frame = 0
         self.score = 0
         self.game_over = False
         self.road_scroll = 0
-        self._next_uid = 1  # <-- NEW: unique IDs for obstacles
 
         self.obs_images = [
             self.assets["trashcan.png"],
@@ -28,10 +26,12 @@ class Game:
             self.assets["old_lady.png"],
             self.assets["broken_car.png"],
         ]
+        # Obstacles live in flat arrays (see ObstacleStore), not in sprite groups
+        self.obstacles = ObstacleStore(self.obs_images, self.lanes)
 
     def reset(self):
         self.all_sprites.empty()
-        self.obstacles.empty()
+        self.obstacles.clear()
         self.player = Car(self.assets["car.png"], self.lanes)
         self.all_sprites.add(self.player)
         self.frame = 0
@@ -41,15 +41,10 @@ class Game:
 
     def spawn_obstacle(self):
         lane = random.randrange(LANES)
-        img = random.choice(self.obs_images)
+        img_id = random.randrange(len(self.obs_images))
         speed = SCROLL_SPEED + random.randint(0, 2)
-        ob = Obstacle(img, lane, speed)
         y = -random.randint(80, 220)
-        ob.set_position(self.lanes, y)
-        ob.uid = self._next_uid  # <-- NEW
-        self._next_uid += 1       # <-- NEW
-        self.obstacles.add(ob)
-        self.all_sprites.add(ob)
+        self.obstacles.spawn(lane, img_id, speed, y)
 
     def update(self):
         if self.game_over:
@@ -59,10 +54,11 @@ class Game:
             self.spawn_obstacle()
 
         self.all_sprites.update()
+        self.obstacles.update()
         self.road_scroll = (self.road_scroll + SCROLL_SPEED) % 40
         self.score += 1  # simple frame-based score
 
-        if pygame.sprite.spritecollide(self.player, self.obstacles, False):
+        if self.obstacles.collides(self.player.rect):
             self.game_over = True
 
     def draw_road(self):
@@ -91,6 +87,7 @@ class Game:
         self.screen.fill(BG)
         self.draw_road()
         self.all_sprites.draw(self.screen)
+        self.obstacles.draw(self.screen)
         self._blit_text(f"Score: {self.score}", 16, 16)
 
         if self.game_over:
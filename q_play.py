@@ -1,14 +1,17 @@
 # q_play.py
 import argparse
 import time
-from rl_utils import QTable, encode_state
+from rl_utils import QTable
 from env import LaneDodgeEnv
+from config import LANES
 
-def play(episodes: int, table_path: str, seed: int | None):
+def play(episodes: int, table_path: str, seed: int | None, max_episode_steps: int | None = None):
     qtab = QTable()
     qtab.load_json(table_path)
+    if qtab.disc.lanes != LANES:
+        raise ValueError(f"{table_path} was trained for {qtab.disc.lanes} lanes, but the game has {LANES}")
 
-    env = LaneDodgeEnv(render_mode="human", seed=seed)
+    env = LaneDodgeEnv(render_mode="human", seed=seed, max_episode_steps=max_episode_steps)
     for ep in range(1, episodes + 1):
         obs, _ = env.reset()
         done = False
@@ -17,9 +20,10 @@ def play(episodes: int, table_path: str, seed: int | None):
         total_passed = 0
 
         while not done:
-            s = encode_state(obs)
+            s = qtab.disc.encode(obs)
             a = qtab.best_action(s)
-            obs, r, done, info = env.step(a)
+            obs, r, terminated, truncated, info = env.step(a)
+            done = terminated or truncated
             total_reward += r
             steps += 1
             total_passed += info.get("passed", 0)
@@ -36,5 +40,6 @@ if __name__ == "__main__":
     ap.add_argument("--episodes", type=int, default=3)
     ap.add_argument("--table", type=str, default="q_table.json")
     ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max_episode_steps", type=int, default=None, help="truncate each episode after N steps (default: no limit)")
     args = ap.parse_args()
-    play(args.episodes, args.table, args.seed)
+    play(args.episodes, args.table, args.seed, args.max_episode_steps)
@@ -2,24 +2,39 @@
 import argparse
 import time
 import random
-from rl_utils import QTable, encode_state, epsilon_greedy, linear_epsilon
+from rl_utils import QTable, Discretizer, DISTANCE_BINS, epsilon_greedy, linear_epsilon
 from env import LaneDodgeEnv, LEFT, STAY, RIGHT
+from config import LANES
 
 def train(episodes: int, alpha: float, gamma: float, eps_start: float, eps_end: float,
-          eps_decay_episodes: int, seed: int | None, save_path: str, render_every: int):
+          eps_decay_episodes: int, seed: int | None, save_path: str, render_every: int,
+          max_episode_steps: int | None = None, max_total_steps: int | None = None,
+          max_seconds: float | None = None, distance_bins: list[float] | None = None):
 
     random.seed(seed if seed is not None else 0)
 
     # Headless (fast) training: render_mode != "human"
-    env = LaneDodgeEnv(render_mode="none", seed=seed)
-    qtab = QTable()
+    env = LaneDodgeEnv(render_mode="none", seed=seed, max_episode_steps=max_episode_steps)
+    # Lane count always follows the game config; bin edges are per-run and saved with the table
+    disc = Discretizer(distance_bins or DISTANCE_BINS, lanes=LANES)
+    qtab = QTable(disc)
+
+    # Always encode through qtab.disc: a resumed table (load_json) brings its own bins
+    if qtab.disc.lanes != LANES:
+        raise ValueError(f"Q-table was built for {qtab.disc.lanes} lanes, but the game has {LANES}")
 
     log_every = max(1, episodes // 20)
     best_return = float("-inf")
 
+    # Global budgets (None = unlimited); checked every step so one long episode can't overrun them
+    total_steps = 0
+    t_start = time.monotonic()
+    deadline = t_start + max_seconds if max_seconds is not None else None
+    out_of_budget = False
+
     for ep in range(1, episodes + 1):
         obs, _ = env.reset()
-        s = encode_state(obs)
+        s = qtab.disc.encode(obs)
         done = False
         total_r = 0.0
         total_passed = 0
@@ -30,50 +45,70 @@ def train(episodes: int, alpha: float, gamma: float, eps_start: float, eps_end:
 
         while not done:
             a = epsilon_greedy(qtab, s, epsilon)
-            obs2, r, done, info = env.step(a)
-            s2 = encode_state(obs2)
+            obs2, r, terminated, truncated, info = env.step(a)
+            done = terminated or truncated
+            s2 = qtab.disc.encode(obs2)
 
             # Optional tiny penalty to discourage frantic lane changes
             if a != STAY and last_action != STAY:
                 r -= 0.002
 
-            qtab.update(s, a, r, s2, alpha, gamma)
+            qtab.update(s, a, r, s2, alpha, gamma, terminal=terminated)
 
             total_r += r
             total_passed += info.get("passed", 0)
             steps += 1
+            total_steps += 1
             s = s2
             last_action = a
 
+            if ((max_total_steps is not None and total_steps >= max_total_steps) or
+                    (deadline is not None and time.monotonic() >= deadline)):
+                out_of_budget = True
+                done = True
+
         if total_r > best_return:
             best_return = total_r
 
         # Render a quick visual episode every N episodes to "peek" at progress
-        if render_every > 0 and ep % render_every == 0:
-            peek(env, qtab)
+        if render_every > 0 and ep % render_every == 0 and not out_of_budget:
+            peek(env, qtab, deadline=deadline)
+            # A peek renders in real time, so it counts against the wall-clock budget
+            if deadline is not None and time.monotonic() >= deadline:
+                out_of_budget = True
 
-        if ep % log_every == 0 or ep == 1 or ep == episodes:
+        if ep % log_every == 0 or ep == 1 or ep == episodes or out_of_budget:
             print(f"[ep {ep:4d}/{episodes}] "
                   f"eps={epsilon:.3f}  return={total_r:7.2f}  passed={total_passed:4d}  steps={steps:5d}  bestR={best_return:7.2f}")
 
+        if out_of_budget:
+            elapsed = time.monotonic() - t_start
+            print(f"Budget reached after {total_steps} steps / {elapsed:.1f}s; stopping at episode {ep}.")
+            break
+
     env.close()
     qtab.save_json(save_path)
     print(f"\nSaved Q-table to {save_path}")
 
-def peek(env: LaneDodgeEnv, qtab: QTable):
+def peek(env: LaneDodgeEnv, qtab: QTable, max_steps: int = 3000, deadline: float | None = None):
     # One quick greedy run (no learning) with drawing ON for ~1 episode.
     # We reuse the same env by temporarily drawing a few frames.
     # (The env only draws when render_mode == 'human'.)
     prev_mode = env.render_mode
     env.render_mode = "human"
+    # Stops on crash, on the env's own time limit, after max_steps, or at the
+    # time.monotonic() deadline (the training wall-clock budget), whichever comes first.
     obs, _ = env.reset()
     done = False
     steps = 0
     total_r = 0.0
-    while not done and steps < 3000:
-        s = encode_state(obs)
+    while not done and steps < max_steps:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        s = qtab.disc.encode(obs)
         a = qtab.best_action(s)
-        obs, r, done, info = env.step(a)
+        obs, r, terminated, truncated, info = env.step(a)
+        done = terminated or truncated
         total_r += r
         steps += 1
     print(f"  ↳ peek run: steps={steps}, return={total_r:.2f}")
@@ -90,7 +125,13 @@ if __name__ == "__main__":
     ap.add_argument("--seed", type=int, default=0)
     ap.add_argument("--save", type=str, default="q_table.json")
     ap.add_argument("--render_every", type=int, default=0, help="render a visual peek every N episodes (0=never)")
+    ap.add_argument("--max_episode_steps", type=int, default=None, help="truncate each episode after N steps (default: no limit)")
+    ap.add_argument("--max_steps", type=int, default=None, help="stop training after N total env steps (default: no limit)")
+    ap.add_argument("--max_seconds", type=float, default=None, help="stop training after N seconds of wall-clock time (default: no limit)")
+    ap.add_argument("--bins", type=float, nargs="+", default=None,
+                    help=f"distance bin edges, increasing (default: {' '.join(map(str, DISTANCE_BINS))})")
     args = ap.parse_args()
 
     train(args.episodes, args.alpha, args.gamma, args.eps_start, args.eps_end,
-          args.eps_decay, args.seed, args.save, args.render_every)
+          args.eps_decay, args.seed, args.save, args.render_every,
+          args.max_episode_steps, args.max_steps, args.max_seconds, args.bins)
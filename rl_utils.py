@@ -1,40 +1,92 @@
 # rl_utils.py
 import json
 import math
-from typing import Dict, Tuple, List
+from bisect import bisect_left
+from typing import Dict, Tuple, List, Sequence
+import numpy as np
 
 # Actions: 0=left, 1=stay, 2=right
 ACTIONS = [0, 1, 2]
 
 # ---- State discretization ----
 # Distances are in [0,1]; we bucket them to keep the Q-table small.
-# You can tweak these cut points later if you like.
+# These are only the defaults: pass your own edges to Discretizer (q_train.py --bins).
 DISTANCE_BINS = [0.10, 0.25, 0.50, 0.75, 1.01]  # 5 bins
+DEFAULT_LANES = 3
 
-def bin_index(x: float) -> int:
-    for i, b in enumerate(DISTANCE_BINS):
-        if x <= b: 
-            return i
-    return len(DISTANCE_BINS) - 1
+class Discretizer:
+    """
+    Maps observations (lane, d_0, ..., d_{lanes-1}) to flat integer state ids.
+    Distance d falls in the first bin whose edge is >= d (values past the last
+    edge go to the last bin). The id is the mixed-radix number
+    (lane, b_0, ..., b_{lanes-1}) with lane as the most significant digit.
+    """
+    def __init__(self, distance_bins: Sequence[float] = DISTANCE_BINS, lanes: int = DEFAULT_LANES):
+        edges = [float(b) for b in distance_bins]
+        if not edges or any(b2 <= b1 for b1, b2 in zip(edges, edges[1:])):
+            raise ValueError(f"distance_bins must be non-empty and strictly increasing, got {edges}")
+        if lanes < 1:
+            raise ValueError(f"lanes must be >= 1, got {lanes}")
+        self.distance_bins = edges
+        self.lanes = int(lanes)
+        self.n_bins = len(edges)
+        self.n_states = self.lanes * self.n_bins ** self.lanes
+        self._edges = np.asarray(edges, dtype=np.float64)
+        # Dropping the last edge makes bisect_left land in [0, n_bins-1] with no clamp
+        self._inner_edges = edges[:-1]
+        # Place value of each distance digit, b_0 first (most significant)
+        self._weights = self.n_bins ** np.arange(self.lanes - 1, -1, -1, dtype=np.int64)
+        self._lane_stride = self.n_bins ** self.lanes
+
+    def encode(self, obs: Sequence[float]) -> int:
+        """Single observation (length lanes + 1) -> state id; pure Python, hot per-step path."""
+        edges, n_bins, lanes = self._inner_edges, self.n_bins, self.lanes
+        lane = int(round(obs[0]))
+        sid = lane if 0 <= lane < lanes else (0 if lane < 0 else lanes - 1)
+        for d in obs[1:]:
+            sid = sid * n_bins + bisect_left(edges, d)
+        return sid
+
+    def encode_batch(self, obs) -> np.ndarray:
+        """Array of observations, shape (N, lanes + 1) -> int64 state ids, shape (N,)."""
+        arr = np.asarray(obs, dtype=np.float64).reshape(-1, self.lanes + 1)
+        lane = np.clip(np.rint(arr[:, 0]).astype(np.int64), 0, self.lanes - 1)
+        bins = np.minimum(np.searchsorted(self._edges, arr[:, 1:], side="left"), self.n_bins - 1)
+        return lane * self._lane_stride + bins @ self._weights
+
+    def decode(self, sid: int) -> Tuple[int, ...]:
+        """State id -> (lane, b_0, ..., b_{lanes-1}); handy for inspecting a table."""
+        digits = []
+        for _ in range(self.lanes):
+            sid, b = divmod(sid, self.n_bins)
+            digits.append(b)
+        return (sid, *reversed(digits))
 
-def encode_state(obs: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+    def to_dict(self) -> dict:
+        return {"distance_bins": self.distance_bins, "lanes": self.lanes}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Discretizer":
+        return cls(d["distance_bins"], d["lanes"])
+
+_DEFAULT_DISCRETIZER = Discretizer()
+
+def encode_state(obs: Sequence[float], disc: Discretizer | None = None) -> int:
     """
     obs = (lane, dL, dM, dR)
-    Returns a discrete state key: (lane, bL, bM, bR)
+    Returns a flat integer state id (see Discretizer; default bins if disc is None)
     """
-    lane = int(round(obs[0]))
-    bL = bin_index(obs[1])
-    bM = bin_index(obs[2])
-    bR = bin_index(obs[3])
-    return (lane, bL, bM, bR)
+    return (disc or _DEFAULT_DISCRETIZER).encode(obs)
 
 # ---- Q-table ----
 class QTable:
-    def __init__(self):
-        # Dict[(lane, bL, bM, bR)] -> [Q_left, Q_stay, Q_right]
-        self.Q: Dict[Tuple[int,int,int,int], List[float]] = {}
+    def __init__(self, discretizer: Discretizer | None = None):
+        # The discretizer that produced the state ids; saved with the table
+        self.disc = discretizer or Discretizer()
+        # Dict[state_id] -> [Q_left, Q_stay, Q_right]
+        self.Q: Dict[int, List[float]] = {}
 
-    def get(self, state: Tuple[int,int,int,int]) -> List[float]:
+    def get(self, state: int) -> List[float]:
         if state not in self.Q:
             self.Q[state] = [0.0, 0.0, 0.0]
         return self.Q[state]
@@ -45,30 +97,39 @@ class QTable:
         best = max(range(3), key=lambda a: (q[a], 1 if a == 1 else 0))
         return best
 
-    def update(self, s, a, r, s_next, alpha: float, gamma: float):
+    def update(self, s, a, r, s_next, alpha: float, gamma: float, terminal: bool = False):
         q = self.get(s)
-        max_next = max(self.get(s_next))
+        # No bootstrapping past a real terminal state (crash); a time-limit
+        # truncation is not terminal, so it still bootstraps from s_next.
+        max_next = 0.0 if terminal else max(self.get(s_next))
         q[a] += alpha * (r + gamma * max_next - q[a])
 
     # ---- save/load ----
-    @staticmethod
-    def _key_to_str(k: Tuple[int,int,int,int]) -> str:
-        return f"{k[0]}|{k[1]}|{k[2]}|{k[3]}"
-
-    @staticmethod
-    def _str_to_key(s: str) -> Tuple[int,int,int,int]:
-        a,b,c,d = s.split("|")
-        return (int(a), int(b), int(c), int(d))
-
+    # Format: {"discretizer": {...}, "Q": {"<state_id>": [q0, q1, q2], ...}}
     def save_json(self, path: str):
-        ser = { self._key_to_str(k): v for k, v in self.Q.items() }
+        ser = {
+            "discretizer": self.disc.to_dict(),
+            "Q": { str(k): v for k, v in self.Q.items() },
+        }
         with open(path, "w", encoding="utf-8") as f:
             json.dump(ser, f)
 
     def load_json(self, path: str):
         with open(path, "r", encoding="utf-8") as f:
             ser = json.load(f)
-        self.Q = { self._str_to_key(k): [float(x) for x in v] for k, v in ser.items() }
+        if "discretizer" in ser:
+            self.disc = Discretizer.from_dict(ser["discretizer"])
+            self.Q = { int(k): [float(x) for x in v] for k, v in ser["Q"].items() }
+            return
+        # Legacy tables: {"lane|bL|bM|bR": [...]} built with the default bins and 3 lanes
+        self.disc = Discretizer()
+        self.Q = {}
+        for k, v in ser.items():
+            lane, *bins = (int(x) for x in k.split("|"))
+            sid = lane
+            for b in bins:
+                sid = sid * self.disc.n_bins + b
+            self.Q[sid] = [float(x) for x in v]
 
 # ---- Epsilon schedules ----
 def linear_epsilon(ep: int, start: float, end: float, decay_episodes: int) -> float:
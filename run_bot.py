@@ -1,4 +1,5 @@
 # run_bot.py
+import argparse
 import time
 from env import LaneDodgeEnv, LEFT, STAY, RIGHT
 
@@ -29,9 +30,8 @@ def greedy_safe_policy(obs, cooldown_frames: int, last_action: int):
 
     return action
 
-def main():
-    env = LaneDodgeEnv(render_mode="human", seed=0)
-    episodes = 30  # play N episodes then exit
+def main(episodes: int = 30, max_episode_steps: int | None = None):
+    env = LaneDodgeEnv(render_mode="human", seed=0, max_episode_steps=max_episode_steps)
     for ep in range(1, episodes + 1):
         obs, _ = env.reset()
         done = False
@@ -42,7 +42,8 @@ def main():
 
         while not done:
             action = greedy_safe_policy(obs, cooldown, last_action)
-            obs, reward, done, info = env.step(action)
+            obs, reward, terminated, truncated, info = env.step(action)
+            done = terminated or truncated
             total_reward += reward
             steps += 1
             last_action = action
@@ -57,4 +58,8 @@ def main():
     env.close()
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--episodes", type=int, default=30, help="play N episodes then exit")
+    ap.add_argument("--max_episode_steps", type=int, default=None, help="truncate each episode after N steps (default: no limit)")
+    args = ap.parse_args()
+    main(args.episodes, args.max_episode_steps)
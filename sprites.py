@@ -1,4 +1,5 @@
 # sprites.py
+import numpy as np
 import pygame
 from config import WIDTH, HEIGHT, LANES, ROAD_MARGIN
 
@@ -35,22 +36,169 @@ class Car(pygame.sprite.Sprite):
         target_x = self.lane_helper.x_for_lane(self.lane)
         self.rect.centerx = target_x
 
-class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, surf: pygame.Surface, lane_idx: int, speed: int):
-        super().__init__()
+# Below this many live obstacles numpy's per-call overhead (~1-2 us per op)
+# costs more than plain Python loops, so the store keeps its columns in lists.
+# Measured crossover for one frame (update + collides + mark_passed + gaps_ahead)
+# is roughly 90-100 obstacles.
+VECTORIZE_ABOVE = 96
+
+class ObstacleStore:
+    """
+    All live obstacles as parallel columns (structure-of-arrays) instead of one
+    Sprite each: top/bottom y, left/right x, lane, speed, uid, image id and a
+    "passed" flag. Images are scaled once per image id and only blitted in draw().
+
+    Above VECTORIZE_ABOVE obstacles the columns are numpy arrays and update()
+    is one vectorized position step plus one compaction. At or below it they
+    are plain lists and every method loops in Python, which is faster at that
+    size. The store switches layout as the count crosses the threshold
+    (back to lists only at half of it, so it doesn't flip every frame).
+    """
+    _COLS = {
+        "_top": np.int32, "_bottom": np.int32, "_left": np.int32, "_right": np.int32,
+        "_lane": np.int16, "_speed": np.int16, "_uid": np.int64, "_img": np.int16,
+        "_passed": np.bool_,
+    }
+
+    def __init__(self, images: list[pygame.Surface], lane_helper: LaneHelper):
         maxw = 40
-        scale = min(1.0, maxw / max(1, surf.get_width()))
-        w = int(surf.get_width()*scale)
-        h = int(surf.get_height()*scale)
-        self.image = pygame.transform.smoothscale(surf, (w, h))
-        self.rect = self.image.get_rect(midtop=(0, -h))
-        self.speed = speed
-        self.lane_idx = lane_idx
+        self.images = []
+        for surf in images:
+            scale = min(1.0, maxw / max(1, surf.get_width()))
+            w = int(surf.get_width()*scale)
+            h = int(surf.get_height()*scale)
+            self.images.append(pygame.transform.smoothscale(surf, (w, h)))
+        self._img_w = [im.get_width() for im in self.images]
+        self._img_h = [im.get_height() for im in self.images]
+        self._lane_x = list(lane_helper.centers)
+        self._next_uid = 1  # unique IDs, never reused (not reset by clear())
+        self.clear()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def clear(self):
+        self.n = 0
+        self._vectorized = False
+        for name in self._COLS:
+            setattr(self, name, [])
+
+    # ---- layout switching ----
+    def _to_arrays(self):
+        cap = max(64, 2 * self.n)
+        for name, dtype in self._COLS.items():
+            arr = np.zeros(cap, dtype=dtype)
+            arr[:self.n] = getattr(self, name)
+            setattr(self, name, arr)
+        self._vectorized = True
 
-    def set_position(self, lane_helper: LaneHelper, y: int):
-        self.rect.midtop = (lane_helper.x_for_lane(self.lane_idx), y)
+    def _to_lists(self):
+        for name in self._COLS:
+            setattr(self, name, getattr(self, name)[:self.n].tolist())
+        self._vectorized = False
+
+    def _grow(self):
+        for name, dtype in self._COLS.items():
+            arr = np.zeros(2 * len(self._top), dtype=dtype)
+            arr[:self.n] = getattr(self, name)[:self.n]
+            setattr(self, name, arr)
+
+    # ---- per-frame ----
+    def spawn(self, lane_idx: int, img_id: int, speed: int, y: int) -> int:
+        uid = self._next_uid
+        self._next_uid += 1
+        w = self._img_w[img_id]
+        left = self._lane_x[lane_idx] - w // 2  # same placement as rect.midtop = (lane center, y)
+        row = (y, y + self._img_h[img_id], left, left + w, lane_idx, speed, uid, img_id, False)
+        if self._vectorized:
+            if self.n == len(self._top):
+                self._grow()
+            for name, v in zip(self._COLS, row):
+                getattr(self, name)[self.n] = v
+        else:
+            for name, v in zip(self._COLS, row):
+                getattr(self, name).append(v)
+        self.n += 1
+        if not self._vectorized and self.n > VECTORIZE_ABOVE:
+            self._to_arrays()
+        return uid
 
     def update(self):
-        self.rect.y += self.speed
-        if self.rect.top > HEIGHT + 10:
-            self.kill()
+        n = self.n
+        if n == 0:
+            return
+        limit = HEIGHT + 10
+        if self._vectorized:
+            speed = self._speed[:n]
+            top = self._top[:n]
+            top += speed
+            self._bottom[:n] += speed
+            keep = top <= limit
+            if not keep.all():
+                k = int(np.count_nonzero(keep))
+                for name in self._COLS:
+                    arr = getattr(self, name)
+                    arr[:k] = arr[:n][keep]
+                self.n = k
+                if k <= VECTORIZE_ABOVE // 2:
+                    self._to_lists()
+        else:
+            speed = self._speed
+            self._top = top = [t + v for t, v in zip(self._top, speed)]
+            self._bottom = [b + v for b, v in zip(self._bottom, speed)]
+            if max(top) > limit:
+                keep = [i for i, t in enumerate(top) if t <= limit]
+                for name in self._COLS:
+                    col = getattr(self, name)
+                    setattr(self, name, [col[i] for i in keep])
+                self.n = len(keep)
+
+    def mark_passed(self, line_y: int) -> int:
+        """Flags obstacles whose top moved below line_y; returns how many are new."""
+        if self._vectorized:
+            n = self.n
+            new = (self._top[:n] > line_y) & ~self._passed[:n]
+            self._passed[:n] |= new
+            return int(np.count_nonzero(new))
+        count = 0
+        passed = self._passed
+        for i, t in enumerate(self._top):
+            if t > line_y and not passed[i]:
+                passed[i] = True
+                count += 1
+        return count
+
+    def collides(self, rect: pygame.Rect) -> bool:
+        """Rect.colliderect against every obstacle."""
+        L, R, T, B = rect.left, rect.right, rect.top, rect.bottom
+        if self._vectorized:
+            n = self.n
+            hit = ((self._left[:n] < R) & (self._right[:n] > L) &
+                   (self._top[:n] < B) & (self._bottom[:n] > T))
+            return bool(hit.any())
+        for l, r, t, b in zip(self._left, self._right, self._top, self._bottom):
+            if l < R and r > L and t < B and b > T:
+                return True
+        return False
+
+    def gaps_ahead(self, line_y: int, default: int) -> list[int]:
+        """Per lane, the smallest line_y - bottom over obstacles with bottom <= line_y (default if none)."""
+        if self._vectorized:
+            n = self.n
+            bottom = self._bottom[:n]
+            ahead = bottom <= line_y
+            gaps = np.full(len(self._lane_x), default, dtype=np.int64)
+            np.minimum.at(gaps, self._lane[:n][ahead], line_y - bottom[ahead])
+            return gaps.tolist()
+        gaps = [default] * len(self._lane_x)
+        for lane, b in zip(self._lane, self._bottom):
+            if b <= line_y and line_y - b < gaps[lane]:
+                gaps[lane] = line_y - b
+        return gaps
+
+    def draw(self, surface: pygame.Surface):
+        cols = (self._img, self._left, self._top)
+        if self._vectorized:
+            cols = [c[:self.n].tolist() for c in cols]
+        imgs = self.images
+        surface.blits([(imgs[i], (x, y)) for i, x, y in zip(*cols)], doreturn=False)